@@ -1,5 +1,189 @@
-import matplotlib.pyplot as plt
+import numbers
+from functools import lru_cache
+
 import numpy as np
+from numba import njit, prange
+
+# Attributes the sensitivity analysis can sweep; the calculator ones are in _compute signature order
+_CALCULATOR_FIELDS = ('co2_captured_per_year', 'energy_cost_per_ton_co2', 'capital_cost_per_ton_co2',
+                      'fixed_opex_per_ton_co2', 'variable_opex_per_ton_co2', 'project_lifetime',
+                      'co2_capture_efficiency', 'discount_rate', 'inflation_rate')
+# tax_credit_percentage never entered the LCO2, so sweeping it returns a constant
+_ANALYSIS_FIELDS = ('co2_sale_price_per_ton', 'co2_sale_percentage', 'carbon_tax',
+                    'tax_credit_percentage', 'learning_rate', 'carbon_tax_threshold')
+# _lco2_kernel inputs after the totals, in signature order
+_KERNEL_FIELDS = ('project_lifetime', 'discount_rate', 'co2_captured_per_year', 'variable_opex_per_ton_co2',
+                  'co2_sale_price_per_ton', 'co2_sale_percentage', 'carbon_tax',
+                  'carbon_tax_threshold', 'learning_rate')
+# Rates that key the cached factor vectors, so they are swept one value at a time
+_FACTOR_FIELDS = ('discount_rate', 'inflation_rate')
+
+# --- Realistic Input Ranges, for the first seven _CALCULATOR_FIELDS ---
+_BOUNDS = np.array([[50000, 5000000], [10, 600], [50, 300], [5, 25], [1, 10],
+                    [10, 40],  # Typical lifetime for industrial projects
+                    [0.7, 0.95]])
+_BOUND_ERRORS = (
+    "CO2 captured per year is unrealistic. Should be between 50,000 and 5,000,000 tons.",
+    "Energy cost per ton of CO2 is outside the expected range (10-600 USD).",
+    "Capital cost per ton of CO2 is outside the expected range (50-300 USD).",
+    "Fixed operating expense (OPEX) per ton of CO2 is outside the expected range (5-25 USD).",
+    "Variable operating expense (OPEX) per ton of CO2 is outside the expected range (1-10 USD).",
+    "Project lifetime is unrealistic. Should be between 10 and 40 years.",
+    "CO2 capture efficiency is unrealistic. Should be between 0.7 and 0.95.",
+)
+
+
+@lru_cache(maxsize=None)
+def _years(n_years):
+    """
+    Year index 0..n-1, shared between callers and therefore read-only.
+    """
+    years = np.arange(n_years)
+    years.setflags(write=False)
+    return years
+
+
+@njit(cache=True)
+def _geometric_series(n_years, ratio):
+    """
+    ratio ** year for the first n years, built by repeated multiplication instead of pow().
+    """
+    series = np.empty(n_years)
+    value = 1.0
+    for year in range(n_years):
+        series[year] = value
+        value *= ratio
+    return series
+
+
+@lru_cache(maxsize=128)
+def _discount_vector(n_years, discount_rate):
+    """
+    Discount factor for each of the first n years, read-only as it is shared through the cache.
+    """
+    discount_factors = _geometric_series(n_years, 1 / (1 + discount_rate))
+    discount_factors.setflags(write=False)
+    return discount_factors
+
+
+@lru_cache(maxsize=128)
+def _factors(n_years, discount_rate, inflation_rate):
+    """
+    Running totals of the combined discount/inflation factor, weighted by the energy degradation
+    multiplier, by the maintenance multiplier and unweighted. Entry n of each is the
+    discounted sum over an n-year project (entry 0 is zero), so costs are a lookup rather than
+    a pass over years.
+    Returned read-only since the arrays are shared between calls through the cache.
+    """
+    years = _years(n_years)
+    combined = _discount_vector(n_years, discount_rate) * _geometric_series(n_years, 1 + inflation_rate)
+    degradation = 1 + 0.01 * years  # 1% annual degradation
+    maintenance = 1 + 0.02 * years  # 2% annual maintenance
+    running_totals = np.zeros((3, n_years + 1))
+    np.cumsum([degradation * combined, maintenance * combined, combined], axis=1, out=running_totals[:, 1:])
+    running_totals.setflags(write=False)
+    return tuple(running_totals)
+
+
+def _compute(co2_captured_per_year, energy_cost_per_ton_co2, capital_cost_per_ton_co2,
+             fixed_opex_per_ton_co2, variable_opex_per_ton_co2, project_lifetime,
+             co2_capture_efficiency, discount_rate, inflation_rate):
+    """
+    Pure form of CO2CaptureCostCalculator.calculate_total_cost_and_co2_captured.
+    Any argument except the discount and inflation rates may be a 1-D array of sweep values;
+    each lifetime counts the years whose index falls below it.
+    """
+    # Lifetimes of zero or less have no active years; initial=0 also covers an empty sweep
+    years_active = np.maximum(np.ceil(project_lifetime), 0).astype(int)
+    energy_weight, fixed_weight, flat_weight = (
+        running_total[years_active]
+        for running_total in _factors(int(np.max(years_active, initial=0)),
+                                      float(discount_rate), float(inflation_rate)))
+
+    # --- Discounted and Inflated Costs over the Lifetime (with Degradation & Maintenance) ---
+    total_operational_cost = co2_captured_per_year * (energy_cost_per_ton_co2 * energy_weight
+                                                      + fixed_opex_per_ton_co2 * fixed_weight
+                                                      + variable_opex_per_ton_co2 * flat_weight)
+
+    total_capital_cost = co2_captured_per_year * capital_cost_per_ton_co2
+    total_cost = total_capital_cost + total_operational_cost
+
+    # Total CO2 captured over the project lifetime, considering capture efficiency
+    total_co2_captured = co2_captured_per_year * project_lifetime * co2_capture_efficiency
+
+    return total_cost, total_co2_captured
+
+
+@lru_cache(maxsize=128)
+def _cached_compute(*params):
+    """
+    _compute for scalar parameters, memoized on the parameter tuple.
+    """
+    return _compute(*params)
+
+
+@njit(cache=True, fastmath=True)
+def _lco2_kernel(total_cost, total_co2_captured, project_lifetime, discount_rate,
+                 co2_captured_per_year, variable_opex_per_ton_co2, co2_sale_price_per_ton,
+                 co2_sale_percentage, carbon_tax, carbon_tax_threshold, learning_rate):
+    """
+    Scalar LCO2 for one parameter set; the discounted cash flow is accumulated year by year
+    without allocating arrays.
+    """
+    annual_co2_captured = total_co2_captured / project_lifetime
+
+    # --- Cost and Revenue Calculations ---
+    annual_costs = total_cost / project_lifetime
+    annual_revenue = annual_co2_captured * co2_sale_price_per_ton * co2_sale_percentage
+    annual_tax = max(0.0, annual_co2_captured - carbon_tax_threshold) * carbon_tax
+
+    # --- Discounted Cash Flow Analysis ---
+    net_annual_costs = annual_costs - annual_revenue + annual_tax
+    discounted_annual_costs = 0.0
+    discount_factor = 1.0
+    year = 0
+    while year < project_lifetime:
+        # --- Apply Learning Curve ---
+        cumulative_co2_captured = annual_co2_captured * (year + 1)
+        annual_variable_opex_learning = variable_opex_per_ton_co2 * (cumulative_co2_captured / co2_captured_per_year) ** (-learning_rate)
+
+        discounted_annual_costs += (net_annual_costs - annual_variable_opex_learning) * discount_factor
+        discount_factor /= 1 + discount_rate
+        year += 1
+
+    return discounted_annual_costs / total_co2_captured
+
+
+@njit(cache=True, inline='always')
+def _swept(base_params, k, param_idx, value):
+    """
+    Kernel input k at one sweep point: the swept value if k is the swept slot, else the base value.
+    """
+    return value if k == param_idx else base_params[k]
+
+
+@njit(cache=True, parallel=True)
+def _sweep(total_cost, total_co2_captured, base_params, param_idx, values):
+    """
+    _lco2_kernel at every sweep point in parallel. base_params holds the kernel inputs in
+    _KERNEL_FIELDS order; the entry at param_idx (if not -1) takes each swept value in turn.
+    The loop body selects scalars only, so no array is allocated per point.
+    """
+    lco2 = np.empty(values.shape[0])
+    for i in prange(values.shape[0]):
+        value = values[i]
+        lco2[i] = _lco2_kernel(total_cost[i], total_co2_captured[i],
+                               _swept(base_params, 0, param_idx, value),
+                               _swept(base_params, 1, param_idx, value),
+                               _swept(base_params, 2, param_idx, value),
+                               _swept(base_params, 3, param_idx, value),
+                               _swept(base_params, 4, param_idx, value),
+                               _swept(base_params, 5, param_idx, value),
+                               _swept(base_params, 6, param_idx, value),
+                               _swept(base_params, 7, param_idx, value),
+                               _swept(base_params, 8, param_idx, value))
+    return lco2
+
 
 class CO2CaptureCostCalculator:
     def __init__(self, co2_captured_per_year, energy_cost_per_ton_co2, capital_cost_per_ton_co2,
@@ -8,20 +192,18 @@ class CO2CaptureCostCalculator:
                  capture_technology='post_combustion'):
 
         # --- Thorough Input Validation ---
-        if not (50000 <= co2_captured_per_year <= 5000000):
-            raise ValueError("CO2 captured per year is unrealistic. Should be between 50,000 and 5,000,000 tons.")
-        if not (10 <= energy_cost_per_ton_co2 <= 600):
-            raise ValueError("Energy cost per ton of CO2 is outside the expected range (10-600 USD).")
-        if not (50 <= capital_cost_per_ton_co2 <= 300):
-            raise ValueError("Capital cost per ton of CO2 is outside the expected range (50-300 USD).")
-        if not (5 <= fixed_opex_per_ton_co2 <= 25):
-            raise ValueError("Fixed operating expense (OPEX) per ton of CO2 is outside the expected range (5-25 USD).")
-        if not (1 <= variable_opex_per_ton_co2 <= 10):
-            raise ValueError("Variable operating expense (OPEX) per ton of CO2 is outside the expected range (1-10 USD).")
-        if not (10 <= project_lifetime <= 40):  # Typical lifetime for industrial projects
-            raise ValueError("Project lifetime is unrealistic. Should be between 10 and 40 years.")
-        if not (0.7 <= co2_capture_efficiency <= 0.95):
-            raise ValueError("CO2 capture efficiency is unrealistic. Should be between 0.7 and 0.95.")
+        inputs = (co2_captured_per_year, energy_cost_per_ton_co2, capital_cost_per_ton_co2,
+                  fixed_opex_per_ton_co2, variable_opex_per_ton_co2, project_lifetime,
+                  co2_capture_efficiency)
+        # np.array would happily parse numeric strings, so require real numbers first
+        for field, value in zip(_CALCULATOR_FIELDS, inputs):
+            if not isinstance(value, numbers.Real):
+                raise TypeError(f"{field} must be a real number, got {type(value).__name__}.")
+        values = np.array(inputs, dtype=np.float64)
+        # Written as a negated in-range test so NaN inputs are rejected too
+        out_of_range = ~((_BOUNDS[:, 0] <= values) & (values <= _BOUNDS[:, 1]))
+        if out_of_range.any():
+            raise ValueError(_BOUND_ERRORS[out_of_range.argmax()])
         
         # --- Store Validated Input Parameters ---
         self.co2_captured_per_year = co2_captured_per_year
@@ -37,43 +219,32 @@ class CO2CaptureCostCalculator:
 
 
     def calculate_total_cost_and_co2_captured(self):
-        years = np.arange(self.project_lifetime)
-        discount_factors = 1 / (1 + self.discount_rate) ** years
-        inflation_factors = (1 + self.inflation_rate) ** years
-
-        # --- Calculate Costs Per Year (with Degradation & Maintenance) ---
-        annual_energy_cost = (self.co2_captured_per_year * self.energy_cost_per_ton_co2 
-                              * (1 + 0.01 * years))  # 1% annual degradation
-        annual_fixed_opex = (self.fixed_opex_per_ton_co2 * self.co2_captured_per_year 
-                             * (1 + 0.02 * years))  # 2% annual maintenance
-        annual_variable_opex = self.variable_opex_per_ton_co2 * self.co2_captured_per_year
-
-        annual_costs = annual_energy_cost + annual_fixed_opex + annual_variable_opex
-
-        # Apply Discounting and Inflation to Yearly Costs
-        discounted_costs = annual_costs * discount_factors * inflation_factors
-        total_operational_cost = discounted_costs.sum()
-
-        total_capital_cost = self.co2_captured_per_year * self.capital_cost_per_ton_co2
-        total_cost = total_capital_cost + total_operational_cost
-
-        # Total CO2 captured over the project lifetime, considering capture efficiency
-        total_co2_captured = (self.co2_captured_per_year * self.project_lifetime 
-                             * self.co2_capture_efficiency)
-
-        return total_cost, total_co2_captured
+        return _cached_compute(*self._parameters().values())
 
     def calculate_cost_per_ton_co2(self):
         """
         Calculate the cost per ton of CO2 captured.
         """
-        total_cost, total_co2_captured = self.calculate_total_cost_and_co2_captured()
-        
-        if total_co2_captured == 0:
+        return self._cost_per_ton_pure(**self._parameters())
+
+    @staticmethod
+    def _cost_per_ton_pure(**params):
+        """
+        Cost per ton of CO2 captured for a bundle of calculator parameters, keyed like
+        _CALCULATOR_FIELDS. No instance is read or modified, so values may be sweep arrays.
+        """
+        total_cost, total_co2_captured = _compute(**params)
+
+        if np.any(total_co2_captured == 0):
             raise ValueError("Total CO2 captured cannot be zero. Please check your inputs.")
 
-        cost_per_ton_co2 = total_cost / total_co2_captured 
-        return cost_per_ton_co2
+        return total_cost / total_co2_captured
+
+    def _parameters(self):
+        """
+        Current calculator parameters, keyed by attribute name in _CALCULATOR_FIELDS order.
+        """
+        return {field: getattr(self, field) for field in _CALCULATOR_FIELDS}
 
 class CO2SensitivityAnalysis:
     """
@@ -97,39 +268,68 @@ class CO2SensitivityAnalysis:
     def analyze_parameter(self, parameters, range_values):
         """
         Analyzes the impact of changing parameters on the levelized cost of CO2.
+        Each parameter's sweep is evaluated in a single parallel pass; neither the
+        calculator nor the analysis is modified. Sweep values (ranges, lists of ints or floats,
+        arrays) are copied into fresh C-contiguous float64 arrays and the totals are built the
+        same way, so every sweep reuses one compiled signature of _sweep and of _lco2_kernel.
         """
+        base_params = self._parameters()
+        results = {}
 
-        original_values = {param: getattr(self, param) if hasattr(self, param) else getattr(self.calculator, param) for param in parameters}
-        results = {param: [] for param in parameters}
+        # Resolve every name once up front, before any sweep runs
+        unknown = [param for param in parameters if param not in base_params]
+        if unknown:
+            raise AttributeError(f"Unknown sensitivity parameter(s): {', '.join(unknown)}")
 
-        try:
-            for param, values in zip(parameters, range_values):
-                for value in values:
-                    if hasattr(self, param):
-                        setattr(self, param, value)
-                    else:
-                        setattr(self.calculator, param, value)
-                    lco2 = self.calculate_levelized_cost_of_co2()
-                    results[param].append(lco2)
+        for param, values in zip(parameters, range_values):
+            results[param] = self._sweep_cost_per_ton(base_params, param, np.array(values, dtype=np.float64))
 
-                # Reset the parameter to its original value
-                setattr(self, param, original_values[param]) if hasattr(self, param) else setattr(self.calculator, param, original_values[param]) 
+        return results
 
-        except Exception as e:
-            print(f"Error occurred during analysis: {e}")
+    @staticmethod
+    def _sweep_cost_per_ton(base_params, param, values):
+        """
+        LCO2 at each value of one parameter, with every other parameter held at its current value.
+        Totals are broadcast through _compute, except that the discount and inflation rates key
+        the cached factor vectors and are computed value by value, and sweeps over analysis-only
+        parameters reuse the memoized totals. _sweep then evaluates the LCO2 kernel per point.
+        """
+        # The kernel divides by the lifetime; fail readably here rather than inside the parallel loop
+        if param == 'project_lifetime' and not np.all(values > 0):
+            raise ValueError("Project lifetime must be positive for every sweep value.")
+
+        params = dict(base_params)
+
+        if param in _FACTOR_FIELDS:
+            total_cost = np.empty(len(values), dtype=np.float64)
+            total_co2_captured = np.empty(len(values), dtype=np.float64)
+            for j, value in enumerate(values):
+                params[param] = value
+                total_cost[j], total_co2_captured[j] = _cached_compute(*(params[field] for field in _CALCULATOR_FIELDS))
+        elif param in _CALCULATOR_FIELDS:
+            params[param] = values
+            total_cost, total_co2_captured = _compute(*(params[field] for field in _CALCULATOR_FIELDS))
+        else:
+            total_cost, total_co2_captured = _cached_compute(*(params[field] for field in _CALCULATOR_FIELDS))
+
+        # The kernel also divides by both CO2 amounts; same reasoning as the lifetime check above
+        if not (np.all(total_co2_captured > 0) and np.all(np.asarray(params['co2_captured_per_year']) > 0)):
+            raise ValueError("Total CO2 captured cannot be zero. Please check your inputs.")
 
-        # Ensure all parameters are reset to their original values
-        finally:
-            for param in parameters:
-                setattr(self, param, original_values[param]) if hasattr(self, param) else setattr(self.calculator, param, original_values[param]) 
-            
-        return results
+        # Fresh writeable C-contiguous float64 totals (not broadcast views) so _sweep compiles one signature
+        total_cost = np.full(values.shape, total_cost, dtype=np.float64)
+        total_co2_captured = np.full(values.shape, total_co2_captured, dtype=np.float64)
+        kernel_params = np.array([base_params[field] for field in _KERNEL_FIELDS], dtype=np.float64)
+        param_idx = _KERNEL_FIELDS.index(param) if param in _KERNEL_FIELDS else -1
+        return _sweep(total_cost, total_co2_captured, kernel_params, param_idx, values)
 
     @staticmethod
     def plot_results(parameters, range_values, results, title="Sensitivity Analysis"):
         """
         Creates a plot to visualize the results of the sensitivity analysis.
         """
+        import matplotlib.pyplot as plt
+
         fig, axes = plt.subplots(len(parameters), 1, figsize=(12, 4 * len(parameters)))
 
         if len(parameters) == 1:
@@ -152,44 +352,38 @@ class CO2SensitivityAnalysis:
         Calculates the Levelized Cost of CO2 (LCO2) over the project lifetime, considering:
         - Potential CO2 sales revenue
         - Carbon tax or incentives
-        - Tax credits
         - Learning curve effects on variable costs
         """
-        years = np.arange(self.calculator.project_lifetime)
-        discount_factors = 1 / (1 + self.calculator.discount_rate) ** years
-
         total_cost, total_co2_captured = self.calculator.calculate_total_cost_and_co2_captured()
-        annual_co2_captured = total_co2_captured / self.calculator.project_lifetime
-
-        # --- Cost and Revenue Calculations ---
-        annual_costs = total_cost / self.calculator.project_lifetime
-        annual_revenue = annual_co2_captured * self.co2_sale_price_per_ton * self.co2_sale_percentage
-        annual_tax = max(0, annual_co2_captured - self.carbon_tax_threshold) * self.carbon_tax
-        tax_credit = self.calculator.capital_cost_per_ton_co2 * self.calculator.co2_captured_per_year * self.tax_credit_percentage
-
-        # --- Apply Learning Curve ---
-        cumulative_co2_captured = np.cumsum(annual_co2_captured)
-        annual_variable_opex_learning = self.calculator.variable_opex_per_ton_co2 * (cumulative_co2_captured / self.calculator.co2_captured_per_year) ** (-self.learning_rate)
-
-        # --- Discounted Cash Flow Analysis ---
-        net_annual_costs = (annual_costs - annual_revenue + annual_tax - annual_variable_opex_learning)
-        discounted_annual_costs = net_annual_costs * discount_factors
+        params = self._parameters()
+        # All float64, so integer inputs (e.g. project_lifetime) reuse the sweep's compiled kernel
+        kernel_params = np.array([params[field] for field in _KERNEL_FIELDS], dtype=np.float64)
+        return _lco2_kernel(np.float64(total_cost), np.float64(total_co2_captured), *kernel_params)
 
-        levelized_cost_of_co2 = discounted_annual_costs.sum() / total_co2_captured
-
-        return levelized_cost_of_co2
+    def _parameters(self):
+        """
+        Current calculator and analysis parameters, keyed by attribute name.
+        """
+        params = self.calculator._parameters()
+        params.update({field: getattr(self, field) for field in _ANALYSIS_FIELDS})
+        return params
 
 # --- Usage Example ---
-calculator = CO2CaptureCostCalculator(co2_captured_per_year=1000000, energy_cost_per_ton_co2=30,
-                                      capital_cost_per_ton_co2=200, fixed_opex_per_ton_co2=15,
-                                      variable_opex_per_ton_co2=5, project_lifetime=30, co2_capture_efficiency=0.9)
+if __name__ == "__main__":
+    # Run against the module under its import name rather than __main__: numba's on-disk cache
+    # records the defining module, so entries compiled here stay loadable by importers and back
+    from Enhanced_CO2_Capture_Cost_Calculator import CO2CaptureCostCalculator, CO2SensitivityAnalysis
+
+    calculator = CO2CaptureCostCalculator(co2_captured_per_year=1000000, energy_cost_per_ton_co2=30,
+                                          capital_cost_per_ton_co2=200, fixed_opex_per_ton_co2=15,
+                                          variable_opex_per_ton_co2=5, project_lifetime=30, co2_capture_efficiency=0.9)
 
-sensitivity_analysis = CO2SensitivityAnalysis(calculator)
+    sensitivity_analysis = CO2SensitivityAnalysis(calculator)
 
-parameters = ['energy_cost_per_ton_co2', 'capital_cost_per_ton_co2', 'fixed_opex_per_ton_co2', 
-              'variable_opex_per_ton_co2', 'project_lifetime', 'co2_capture_efficiency']
-range_values = [np.linspace(10, 50, 5), np.linspace(100, 300, 5), np.linspace(5, 25, 5), 
-                np.linspace(1, 10, 5), np.linspace(10, 40, 5), np.linspace(0.7, 0.95, 5)]
+    parameters = ['energy_cost_per_ton_co2', 'capital_cost_per_ton_co2', 'fixed_opex_per_ton_co2',
+                  'variable_opex_per_ton_co2', 'project_lifetime', 'co2_capture_efficiency']
+    range_values = [np.linspace(10, 50, 5), np.linspace(100, 300, 5), np.linspace(5, 25, 5),
+                    np.linspace(1, 10, 5), np.linspace(10, 40, 5), np.linspace(0.7, 0.95, 5)]
 
-results = sensitivity_analysis.analyze_parameter(parameters, range_values)
-sensitivity_analysis.plot_results(parameters, range_values, results)
+    results = sensitivity_analysis.analyze_parameter(parameters, range_values)
+    sensitivity_analysis.plot_results(parameters, range_values, results)